@@ -11,11 +11,20 @@ from __future__ import annotations
 import os
 import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Dict, Iterable, List
+from typing import Dict, Iterable, Iterator, List
 
 import requests
 
+_NOTE_RE = re.compile(r"todo|fixme", re.IGNORECASE)
+_EVAL_RE = re.compile(r"\beval\s*\(")
+# Matches `uses:` steps (bare or as a list item, optionally quoted or followed
+# by a comment) whose ref is a branch like main/master or a v* tag.
+_MUTABLE_ACTION_RE = re.compile(
+    r"""^(?:-\s+)?uses:\s*['"]?[^\s'"#@]+@(?:main|master|v)[A-Za-z0-9._/-]*['"]?\s*(?:#.*)?$"""
+)
+
 
 @dataclass
 class Finding:
@@ -39,25 +48,37 @@ def github_headers(token: str) -> Dict[str, str]:
     }
 
 
-def paged_get(
-    url: str, headers: Dict[str, str], params: Dict[str, str] | None = None
-) -> List[dict]:
-    items: List[dict] = []
+def github_session(token: str) -> requests.Session:
+    # One session per run keeps the TLS connection to api.github.com alive
+    # across the paginated listings and the final comment upsert.
+    session = requests.Session()
+    session.headers.update(github_headers(token))
+    return session
+
+
+def iter_paged(
+    session: requests.Session, url: str, params: Dict[str, str] | None = None
+) -> Iterator[dict]:
     page = 1
     while True:
         qp = {"per_page": 100, "page": page}
         if params:
             qp.update(params)
-        response = requests.get(url, headers=headers, params=qp, timeout=30)
+        response = session.get(url, params=qp, timeout=30)
         response.raise_for_status()
         batch = response.json()
         if not isinstance(batch, list) or not batch:
             break
-        items.extend(batch)
+        yield from batch
         if len(batch) < 100:
             break
         page += 1
-    return items
+
+
+def paged_get(
+    session: requests.Session, url: str, params: Dict[str, str] | None = None
+) -> List[dict]:
+    return list(iter_paged(session, url, params))
 
 
 def iter_added_lines(patch: str) -> Iterable[str]:
@@ -68,6 +89,20 @@ def iter_added_lines(patch: str) -> Iterable[str]:
             yield line[1:]
 
 
+def iter_reviewable(files: Iterable[dict]) -> Iterator[dict]:
+    # Drop entries with nothing to scan before any per-line work happens.
+    for file_entry in files:
+        if file_entry.get("status") == "removed":
+            continue
+        filename = file_entry.get("filename")
+        patch = file_entry.get("patch")
+        if not isinstance(filename, str) or not filename:
+            continue
+        if not isinstance(patch, str) or not patch:
+            continue
+        yield file_entry
+
+
 def analyze_file(file_entry: dict) -> List[Finding]:
     filename = file_entry.get("filename", "")
     patch = file_entry.get("patch") or ""
@@ -76,20 +111,19 @@ def analyze_file(file_entry: dict) -> List[Finding]:
     if not patch:
         return findings
 
-    added_lines = list(iter_added_lines(patch))
     lower_name = filename.lower()
+    is_script = lower_name.endswith((".py", ".js", ".ts", ".sh", ".bash"))
+    is_python = lower_name.endswith(".py")
 
-    for idx, line in enumerate(added_lines, start=1):
+    for idx, line in enumerate(iter_added_lines(patch), start=1):
         stripped = line.strip()
 
-        if "todo" in stripped.lower() or "fixme" in stripped.lower():
+        if _NOTE_RE.search(stripped):
             findings.append(
                 Finding(filename, "info", f"Added unresolved note: `{stripped[:120]}`")
             )
 
-        if re.search(r"\beval\s*\(", stripped) and lower_name.endswith(
-            (".py", ".js", ".ts", ".sh", ".bash")
-        ):
+        if is_script and _EVAL_RE.search(stripped):
             findings.append(
                 Finding(
                     filename,
@@ -98,7 +132,7 @@ def analyze_file(file_entry: dict) -> List[Finding]:
                 )
             )
 
-        if "shell=True" in stripped and lower_name.endswith(".py"):
+        if is_python and "shell=True" in stripped:
             findings.append(
                 Finding(
                     filename,
@@ -107,17 +141,14 @@ def analyze_file(file_entry: dict) -> List[Finding]:
                 )
             )
 
-        if stripped.startswith("uses:") and "@" in stripped:
-            # Flag mutable refs like main/master/v* tags.
-            if re.search(r"@[A-Za-z][A-Za-z0-9._/-]*$", stripped):
-                if any(token in stripped for token in ("@main", "@master", "@v")):
-                    findings.append(
-                        Finding(
-                            filename,
-                            "medium",
-                            "Action reference appears mutable; pin to a full commit SHA for supply-chain safety.",
-                        )
-                    )
+        if "uses:" in stripped and _MUTABLE_ACTION_RE.match(stripped):
+            findings.append(
+                Finding(
+                    filename,
+                    "medium",
+                    "Action reference appears mutable; pin to a full commit SHA for supply-chain safety.",
+                )
+            )
 
         if len(stripped) > 180:
             findings.append(
@@ -139,8 +170,10 @@ def format_comment(
 ) -> str:
     marker = "<!-- copilot-review-bot -->"
     changed = len(files)
-    added = sum(int(f.get("additions", 0)) for f in files)
-    deleted = sum(int(f.get("deletions", 0)) for f in files)
+    added = deleted = 0
+    for file_entry in files:
+        added += int(file_entry.get("additions", 0))
+        deleted += int(file_entry.get("deletions", 0))
 
     lines = [
         marker,
@@ -190,18 +223,16 @@ def format_comment(
     return "\n".join(lines)
 
 
-def upsert_comment(
-    owner: str, repo_name: str, pr_number: str, token: str, body: str
-) -> None:
-    headers = github_headers(token)
+def find_existing_comment(
+    session: requests.Session, owner: str, repo_name: str, pr_number: str
+) -> int | None:
     comments_url = (
         f"https://api.github.com/repos/{owner}/{repo_name}/issues/{pr_number}/comments"
     )
-    comments = paged_get(comments_url, headers)
 
+    # Pages are fetched lazily, so the walk stops at the first marker comment.
     marker = "<!-- copilot-review-bot -->"
-    existing_id: int | None = None
-    for comment in comments:
+    for comment in iter_paged(session, comments_url):
         user_login = ((comment.get("user") or {}).get("login") or "").lower()
         comment_body = comment.get("body") or ""
         if marker in comment_body and user_login in {
@@ -209,16 +240,27 @@ def upsert_comment(
             "dboone323",
             "codex",
         }:
-            existing_id = comment.get("id")
-            break
+            return comment.get("id")
+    return None
+
+
+def upsert_comment(
+    session: requests.Session,
+    owner: str,
+    repo_name: str,
+    pr_number: str,
+    body: str,
+    existing_id: int | None,
+) -> None:
+    comments_url = (
+        f"https://api.github.com/repos/{owner}/{repo_name}/issues/{pr_number}/comments"
+    )
 
     if existing_id:
         url = f"https://api.github.com/repos/{owner}/{repo_name}/issues/comments/{existing_id}"
-        response = requests.patch(url, headers=headers, json={"body": body}, timeout=30)
+        response = session.patch(url, json={"body": body}, timeout=30)
     else:
-        response = requests.post(
-            comments_url, headers=headers, json={"body": body}, timeout=30
-        )
+        response = session.post(comments_url, json={"body": body}, timeout=30)
 
     response.raise_for_status()
 
@@ -230,14 +272,22 @@ def main() -> int:
     pr_number = require_env("PR_NUMBER")
     repo = f"{owner}/{repo_name}"
 
-    headers = github_headers(token)
+    session = github_session(token)
     files_url = (
         f"https://api.github.com/repos/{owner}/{repo_name}/pulls/{pr_number}/files"
     )
-    files = paged_get(files_url, headers)
+
+    # Both listings are independent network round-trips; overlap them.
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        files_future = pool.submit(paged_get, session, files_url)
+        comment_future = pool.submit(
+            find_existing_comment, session, owner, repo_name, pr_number
+        )
+        files = files_future.result()
+        existing_id = comment_future.result()
 
     findings: List[Finding] = []
-    for file_entry in files[:200]:
+    for file_entry in iter_reviewable(files[:200]):
         findings.extend(analyze_file(file_entry))
 
     # Keep the comment concise and stable between reruns.
@@ -247,7 +297,12 @@ def main() -> int:
 
     body = format_comment(repo=repo, pr_number=pr_number, files=files, findings=deduped)
     upsert_comment(
-        owner=owner, repo_name=repo_name, pr_number=pr_number, token=token, body=body
+        session=session,
+        owner=owner,
+        repo_name=repo_name,
+        pr_number=pr_number,
+        body=body,
+        existing_id=existing_id,
     )
     print(
         f"Posted review comment for {repo} PR #{pr_number} with {len(deduped)} finding(s)."